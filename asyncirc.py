@@ -4,59 +4,45 @@ from __future__ import annotations
 
 
 import re
-import sys
 import asyncio
-import datetime
-from typing import Callable, cast
+import logging
+from typing import AsyncIterator, Callable, ClassVar, cast
 from dataclasses import dataclass, field
 
 
-LOG_LEVEL = 'debug'
+AWAY_ON  = b'AWAY :Auto-away\r\n'
+AWAY_OFF = b'AWAY\r\n'
+AWAY_TIMEOUT = 10.0  # seconds to wait for the server to confirm AWAY
 
 
-def debug(*a: object) -> None:
-    if LOG_LEVEL == 'debug':
-        print(f'[{datetime.datetime.now()}]', *a, file=sys.stderr)
+log = logging.getLogger('asyncirc')
 
+# The logger checks its level before formatting the %-style arguments.
+debug = log.debug
 
-IRC_PAT = re.compile(r'''
-    \s*
+
+IRC_PAT = re.compile(
+    rb' *'
     # Time specification is apparently a thing
-    (?:
-        @time=
-        (?P<ts>\d\d\d\d-\d\d-\d\dT\d\d:\d\d:\d\d.\d\d\dZ)
-        \s+
-    )?
-    (?:
-        :
-        (?:(?P<nick>[^!@\s]+)!)?
-        (?:(?P<user>[^@\s]+)@)?
-        (?P<host>[^\s]+)
-        \s+
-    )?
-    \s*
-    (?P<command>\w+)
-    \s*
-    (?:
-        (?P<spargs>.*?)
-        \s*
-        (?:
-            :
-            (?P<text>[^\r\n]*)
-        )?
-    )
-    (?:\r\n|[\r\n])
-''', re.VERBOSE)
-
-PatGroupsType = (tuple[str|None, None, None, None, str, str, str|None] |
-                 tuple[str|None, None, None,  str, str, str, str|None] |
-                 tuple[str|None, None,  str,  str, str, str, str|None] |
-                 tuple[str|None,  str,  str,  str, str, str, str|None])
+    rb'(?:@time=(?P<ts>\d\d\d\d-\d\d-\d\dT\d\d:\d\d:\d\d.\d\d\dZ) +)?'
+    rb'(?::(?:(?P<nick>[^!@ ]+)!)?(?:(?P<user>[^@ ]+)@)?(?P<host>[^ ]+) +)?'
+    rb'(?P<command>\w+) *'
+    # Middle params may contain a colon, just not start with one
+    rb'(?P<spargs>(?:[^: \r\n][^ \r\n]*(?: +[^: \r\n][^ \r\n]*)*)?) *'
+    rb'(?::(?P<text>[^\r\n]*))?'
+    rb'(?:\r\n|[\r\n])')
+
+PatGroupsType = (tuple[bytes|None,  None,  None,  None, bytes, bytes, bytes|None] |
+                 tuple[bytes|None,  None,  None, bytes, bytes, bytes, bytes|None] |
+                 tuple[bytes|None,  None, bytes, bytes, bytes, bytes, bytes|None] |
+                 tuple[bytes|None, bytes, bytes, bytes, bytes, bytes, bytes|None])
 
 
 def selftest() -> None:
-    def test(line: str, reference: tuple[str | None, ...]) -> None:
-        match = re.match(IRC_PAT, line)
+    def test(line_str: str, reference_str: tuple[str | None, ...]) -> None:
+        line = line_str.encode()
+        reference = tuple(None if s is None else s.encode() for s in reference_str)
+        match = IRC_PAT.match(line)
         groups: PatGroupsType | None = None
         if match is not None:
             groups = cast(PatGroupsType, match.groups())
@@ -69,6 +55,10 @@ def selftest() -> None:
             print(f'{reference = }')
             print(f'   {groups = }')
             raise
+        (_, nick, user, host, cmd, spargs, text) = reference
+        args = [cmd.lower(), *spargs.split(), *([] if text is None else [text])]
+        parsed = parse_line(line)
+        assert parsed == (Source(nick, user, host), args), (parsed, reference)
     ts = '2023-10-02T06:27:18.020Z'
     test(f'@time={ts} :nick!user@host COMMAND arg :long text\r\n',
          (ts,   'nick', 'user', 'host', 'COMMAND', 'arg', 'long text'))
@@ -88,47 +78,96 @@ def selftest() -> None:
          (None,   None,   None,   None, 'COMMAND', '', None))
     test(':libera.proxy 333 lericson ##foo mawk!mawk@mawk 1690531926\r\n',
          (None, None, None, 'libera.proxy', '333', 'lericson ##foo mawk!mawk@mawk 1690531926', None))
+    test(':nick!user@host PRIVMSG #chan :hi :) bye\r\n',
+         (None, 'nick', 'user', 'host', 'PRIVMSG', '#chan', 'hi :) bye'))
+    test('COMMAND a:b :c\r\n',
+         (None, None, None, None, 'COMMAND', 'a:b', 'c'))
 
 
-selftest()
-
-
-@dataclass
+@dataclass(slots=True)
 class Source:
-    nick: str|None = None
-    user: str|None = None
-    host: str|None = None
+    nick: bytes|None = None
+    user: bytes|None = None
+    host: bytes|None = None
 
     @property
     def is_server(self) -> bool:
         return not self.nick
 
 
-def parse_line(line: str) -> tuple[Source, list[str]]:
+def split_line(line: bytes) -> tuple[bytes | None, bytes, bytes]:
+    """Split an IRC line by hand into prefix, command and unparsed params
+
+    IRC_PAT is only the reference for this in selftest.
+    """
+
+    rest = line.rstrip(b'\r\n').lstrip()
+
+    # Message tags, e.g. @time=
+    if rest.startswith(b'@'):
+        _, _, rest = rest.partition(b' ')
+        rest = rest.lstrip()
+
+    prefix: bytes | None = None
+    if rest.startswith(b':'):
+        prefix, _, rest = rest[1:].partition(b' ')
+
+    cmd, _, params = rest.lstrip().partition(b' ')
 
-    if (match := re.match(IRC_PAT, line)) is None:
-        return Source(), ['parse_failed', line]
+    return prefix, cmd, params
 
-    groups: PatGroupsType = cast(PatGroupsType, match.groups())
-    (_, nick, user, host, cmd, spargs, text) = groups
 
-    cmd = cmd.lower()
+def parse_source(prefix: bytes | None) -> Source:
 
-    args = spargs.split() if spargs else []
-    if text is not None:
+    if prefix is None:
+        return Source()
+
+    nick: bytes | None = None
+    user: bytes | None = None
+    if b'!' in prefix:
+        nick, _, prefix = prefix.partition(b'!')
+    if b'@' in prefix:
+        user, _, prefix = prefix.partition(b'@')
+
+    return Source(nick, user, prefix)
+
+
+def parse_params(params: bytes) -> list[bytes]:
+
+    params = params.lstrip()
+    if params.startswith(b':'):
+        return [params[1:]]
+
+    spargs, sep, text = params.partition(b' :')
+
+    args = spargs.split()
+    if sep:
         args.append(text)
 
-    return Source(nick, user, host), [cmd, *args]
+    return args
+
+
+def parse_line(line: bytes) -> tuple[Source, list[bytes]]:
 
+    prefix, cmd, params = split_line(line)
 
-class Interrupt(asyncio.mixins._LoopBoundMixin):  # pylint: disable=protected-access
+    if not cmd:
+        return Source(), [b'parse_failed', line]
 
-    _waiters: list[asyncio.Future[None]]
-    _get_loop: Callable[[], asyncio.AbstractEventLoop]
+    return parse_source(prefix), [cmd.lower(), *parse_params(params)]
+
+
+selftest()
+
+
+class Interrupt:
+
+    __slots__ = ('_waiters',)
+
+    _waiters: dict[asyncio.Future[bool], None]  # ordered set
 
     def __init__(self) -> None:
-        super().__init__()
-        self._waiters = []
+        self._waiters = {}
 
     def __repr__(self) -> str:
         res = super().__repr__()
@@ -136,81 +175,128 @@ class Interrupt(asyncio.mixins._LoopBoundMixin):  # pylint: disable=protected-ac
 
     def trigger(self) -> None:
         for fut in self._waiters:
-            if not fut.done():
-                fut.set_result(None)
+            _resolve(fut, True)
 
     async def wait(self, *, timeout: float | None = None) -> bool:
-        fut: asyncio.Future[None] = self._get_loop().create_future()
-        self._waiters.append(fut)
-        aw = asyncio.wait_for(fut, timeout=timeout)
+        """Wait for a trigger, returning False if *timeout* passes first"""
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[bool] = loop.create_future()
+        # A timer handle resolving the future is much cheaper than the task
+        # that asyncio.wait_for would create.
+        handle = None if timeout is None else loop.call_later(timeout, _resolve, fut, False)
+        self._waiters[fut] = None
         try:
-            await aw
-        except TimeoutError:
-            return False
-        else:
-            return True
+            return await fut
         finally:
-            self._waiters.remove(fut)
+            if handle is not None:
+                handle.cancel()
+            del self._waiters[fut]
+
 
+def _resolve(fut: asyncio.Future[bool], result: bool) -> None:
+    if not fut.done():
+        fut.set_result(result)
 
-@dataclass
+
+@dataclass(slots=True)
 class Client:
     reader: asyncio.StreamReader = field(repr=False)
     writer: asyncio.StreamWriter = field(repr=False)
 
-    my_nick:  str | None = None
+    my_nick: bytes | None = None
     is_away: bool | None = None
 
     idle_interrupt: Interrupt = field(default_factory=Interrupt, repr=False)
     away_changed:   Interrupt = field(default_factory=Interrupt, repr=False)
 
     async def set_away(self, awayness: bool) -> None:
-        awaycmd = b'AWAY :Auto-away\r\n' if awayness else b'AWAY\r\n'
         if self.is_away != awayness:
-            self.writer.write(awaycmd)
-            await self.away_changed.wait()
+            self.writer.write(AWAY_ON if awayness else AWAY_OFF)
+            # Drain only once the reply is in: it may yield, and the reply
+            # must not arrive before we are waiting for it.
+            if not await self.away_changed.wait(timeout=AWAY_TIMEOUT):
+                log.warning('%s no reply to AWAY in %gs', self, AWAY_TIMEOUT)
+                return
+            await self.writer.drain()
             assert self.is_away == awayness
 
-    async def communicate(self, encoding='utf-8') -> None:
+    async def communicate(self) -> None:
         """Main communication coroutine"""
 
-        self.my_nick = 'e'
+        self.my_nick = b'e'
         self.is_away = False
 
         self.writer.write(b'USER a b c d\r\n')
-        self.writer.write(f'NICK {self.my_nick}\r\n'.encode(encoding))
+        self.writer.write(b'NICK ' + self.my_nick + b'\r\n')
 
         await self.writer.drain()
 
-        async for line_bytes in self.reader:
+        handlers = self.handlers
 
-            try:
-                line = line_bytes.decode('utf-8')
-            except UnicodeDecodeError as e:
-                print(line)
-                print(f'{encoding} decode failed, falling back to latin1', file=sys.stderr)
-                print(f'{e} on {line_bytes!r}', file=sys.stderr)
-                line = line_bytes.decode('latin1')
+        async for lines in self._readline_batches():
+            for line in lines:
 
-            src, args = parse_line(line)
+                prefix, cmd, params = split_line(line)
 
-            match args:
+                # Most lines are of no interest, so only those we handle get
+                # their source and params parsed.
+                if (handler := handlers.get(cmd)) is not None:
+                    handler(self, parse_source(prefix), parse_params(params))
 
-                case 'nick', new_nick, *_ if src.nick == self.my_nick:
-                    debug(self, f'{new_nick = }')
-                    self.my_nick = new_nick
+    async def _readline_batches(self, bufsize: int = 1 << 16,
+                                limit: int = 1 << 16) -> AsyncIterator[list[bytes]]:
+        """Read in big chunks, yielding all complete lines of each at once
 
-                case 'privmsg', *_ if src.nick == self.my_nick:
-                    self.idle_interrupt.trigger()
+        Avoids StreamReader.readline, which searches and copies out of its
+        buffer for every single line, and resuming a generator per line.
+        """
 
-                case '305', who, *_ if who == self.my_nick:
-                    self.is_away = False
-                    debug(self, f'{self.is_away = }')
-                    self.away_changed.trigger()
+        tail = b''
 
-                case '306', who, *_ if who == self.my_nick:
-                    self.is_away = True
-                    debug(self, f'{self.is_away = }')
-                    self.away_changed.trigger()
+        while chunk := await self.reader.read(bufsize):
 
-            await self.writer.drain()
+            *lines, tail = (tail + chunk).split(b'\n')
+
+            if len(tail) > limit:
+                raise ValueError(f'line exceeds {limit} bytes')
+
+            yield lines
+
+        if tail:
+            yield [tail]
+
+    def _on_nick(self, src: Source, args: list[bytes]) -> None:
+        match args:
+            case new_nick, *_ if src.nick == self.my_nick:
+                debug('%s new_nick = %r', self, new_nick)
+                self.my_nick = new_nick
+
+    def _on_privmsg(self, src: Source, args: list[bytes]) -> None:  # pylint: disable=unused-argument
+        if src.nick == self.my_nick:
+            self.idle_interrupt.trigger()
+
+    def _on_305(self, src: Source, args: list[bytes]) -> None:  # pylint: disable=unused-argument
+        match args:
+            case who, *_ if who == self.my_nick:
+                self.is_away = False
+                debug('%s self.is_away = %r', self, self.is_away)
+                self.away_changed.trigger()
+
+    def _on_306(self, src: Source, args: list[bytes]) -> None:  # pylint: disable=unused-argument
+        match args:
+            case who, *_ if who == self.my_nick:
+                self.is_away = True
+                debug('%s self.is_away = %r', self, self.is_away)
+                self.away_changed.trigger()
+
+    handlers: ClassVar[dict[bytes, Callable[[Client, Source, list[bytes]], None]]] = {
+        b'nick':    _on_nick,
+        b'privmsg': _on_privmsg,
+        b'305':     _on_305,
+        b'306':     _on_306,
+    }
+    # Commands are case insensitive, but servers send them in one case or
+    # the other, so rather than lowering every one of them, look up both
+    # spellings. Mixed case like Privmsg goes unhandled. Numerics are the
+    # same in both.
+    handlers |= {cmd.upper(): handler for cmd, handler in handlers.items()}
@@ -6,6 +6,7 @@ Connect this to your Irssi with irssiproxy or whatever you use.
 from __future__ import annotations
 
 import asyncio
+import logging
 import sys
 from dataclasses import dataclass, field
 from math import log2
@@ -16,6 +17,8 @@ from timer import Timer
 
 debug = asyncirc.debug
 
+LOG_LEVEL = logging.DEBUG
+
 
 INF = float('inf')
 
@@ -57,52 +60,60 @@ async def idle_away(control: Control, *,
                     backoff_deadzone: float = IDLE_BACKOFF_DEADZONE,
                     backoff_decay: float = IDLE_BACKOFF_DECAY) -> None:
 
-    def make_idle_timer() -> Timer:
-        return Timer(idle_timeout * (backoff_factor ** backoff_exp))
+    # backoff_exp is bounded, so every (idle, backoff window) duration pair
+    # can be computed up front.
+    durations = tuple((idle_timeout * (backoff_factor ** exp),
+                       idle_timeout * (backoff_factor ** exp) * backoff_deadzone)
+                      for exp in range(backoff_max_exp + 1))
 
-    def make_backoff_timer() -> Timer:
-        duration = idle_timer.duration * backoff_deadzone
-        start_at = idle_timer.expires - duration / 2
-        return Timer(duration, started_at=start_at)
+    def make_timers(now: float) -> tuple[Timer, Timer]:
+        idle_duration, backoff_duration = durations[backoff_exp]
+        idle = Timer(idle_duration, started_at=now)
+        start_at = idle.expires - backoff_duration / 2
+        return idle, Timer(backoff_duration, started_at=start_at)
 
+    now:           float = Timer.clock()
     backoff_exp:     int = 0
-    idle_timer:    Timer = make_idle_timer()
-    backoff_timer: Timer = make_backoff_timer()
-    decay_timer:   Timer = Timer(backoff_decay)
+    idle_timer:    Timer
+    backoff_timer: Timer
+    idle_timer, backoff_timer = make_timers(now)
+    decay_timer:   Timer = Timer(backoff_decay, started_at=now)
 
     while True:
 
         timeout = idle_timer.remaining if not idle_timer.is_never else None
 
-        debug()
-        debug(f'   {idle_timer = }')
+        debug('')
+        debug('   idle_timer = %r', idle_timer)
 
         interrupted = await control.idle_interrupt.wait(timeout=timeout)
 
-        debug(f'  {interrupted = }')
-        debug(f'   {idle_timer = }')
-        debug(f'{backoff_timer = }')
-        debug(f'  {decay_timer = }')
+        # One clock reading for all the timer checks below.
+        now = Timer.clock()
+
+        debug('  interrupted = %r', interrupted)
+        debug('   idle_timer = %r', idle_timer)
+        debug('backoff_timer = %r', backoff_timer)
+        debug('  decay_timer = %r', decay_timer)
 
         if interrupted:
 
-            if backoff_timer.is_running:
+            if backoff_timer.is_running_at(now):
                 backoff_exp += 1
                 backoff_exp  = min(backoff_exp, backoff_max_exp)
 
-            if decay_timer.is_expired:
+            if decay_timer.is_expired_at(now):
                 backoff_exp -= 1
                 backoff_exp  = max(backoff_exp, 0)
-                decay_timer  = Timer(backoff_decay)
+                decay_timer  = Timer(backoff_decay, started_at=now)
 
-            debug(f'  {backoff_exp = }')
+            debug('  backoff_exp = %r', backoff_exp)
 
-            idle_timer    = make_idle_timer()
-            backoff_timer = make_backoff_timer()
+            idle_timer, backoff_timer = make_timers(now)
 
             await control.set_away(False)
 
-        elif idle_timer.is_expired:
+        elif idle_timer.is_expired_at(now):
 
             idle_timer = Timer.never()
 
@@ -112,7 +123,7 @@ async def idle_away(control: Control, *,
             raise RuntimeError('logically impossible')
 
 
-@dataclass
+@dataclass(slots=True)
 class Control:
 
     clients: dict[str, asyncirc.Client] = field(default_factory=dict)
@@ -120,8 +131,12 @@ class Control:
     idle_interrupt: asyncirc.Interrupt = field(default_factory=asyncirc.Interrupt, repr=False)
 
     async def set_away(self, awayness: bool) -> None:
+        clients = [client for client in self.clients.values()
+                   if client.is_away != awayness]
+        if not clients:
+            return
         async with asyncio.TaskGroup() as tg:
-            for client in self.clients.values():
+            for client in clients:
                 tg.create_task(client.set_away(awayness))
 
     async def unix_socket_client(self, path: str) -> None:
@@ -146,4 +161,6 @@ async def main(args: list[str] = sys.argv[1:]) -> None:
 
 
 if __name__ == '__main__':
+    logging.basicConfig(format='[%(asctime)s] %(message)s')
+    asyncirc.log.setLevel(LOG_LEVEL)
     asyncio.run(main())
@@ -52,13 +52,14 @@ TimeT = TypeVar('TimeT',  bound=TimeLike)
 class AbstractTimer(Generic[TimeT, DeltaT]):
     """A Timer is a started_at time, and a duration."""
 
-    __slots__ = 'started_at', 'duration'
+    __slots__ = 'started_at', 'duration', 'expires'
 
     started_at: TimeT
     duration:   DeltaT
+    expires:    TimeT  # started_at + duration, kept for the *_at queries
 
     def __init__(self,
-                 duration:   DeltaT,
+                 duration:   DeltaT | AbstractTimer[TimeT, DeltaT],
                  *,
                  elapsed:    DeltaT | None = None,
                  starts_in:  DeltaT | None = None,
@@ -78,10 +79,11 @@ class AbstractTimer(Generic[TimeT, DeltaT]):
 
         self.started_at = started_at
 
-        if hasattr(duration, 'duration'):
+        if isinstance(duration, AbstractTimer):
             duration = duration.duration
 
         self.duration = duration
+        self.expires = started_at + duration
 
     def __repr__(self) -> str:
         tp = type(self)
@@ -97,36 +99,50 @@ class AbstractTimer(Generic[TimeT, DeltaT]):
 
     @property
     def is_running(self) -> bool:
-        return self.started_at < self.clock() < self.expires
+        return self.is_running_at(self.clock())
 
     @property
     def is_started(self) -> bool:
-        return self.started_at < self.clock()
+        return self.is_started_at(self.clock())
 
     @property
     def is_expired(self) -> bool:
-        return self.expires < self.clock()
+        return self.is_expired_at(self.clock())
 
     @property
     def is_never(self) -> bool:
         return self.eternity() <= self.expires
 
-    @property
-    def expires(self) -> TimeT:
-        return self.started_at + self.duration
-
     @property
     def elapsed(self: AbstractTimer[TimeT, DeltaT]) -> DeltaT:
-        return self.clock() - self.started_at
+        return self.elapsed_at(self.clock())
 
     @property
     def remaining(self) -> DeltaT:
-        return self.duration - self.elapsed
+        return self.remaining_at(self.clock())
 
     @property
     def starts_in(self) -> DeltaT:
         return -self.elapsed
 
+    # The *_at variants take the current time so that callers looking at
+    # several timers at once can read the clock only once.
+
+    def is_running_at(self, now: TimeT) -> bool:
+        return self.started_at < now < self.expires
+
+    def is_started_at(self, now: TimeT) -> bool:
+        return self.started_at < now
+
+    def is_expired_at(self, now: TimeT) -> bool:
+        return self.expires < now
+
+    def elapsed_at(self, now: TimeT) -> DeltaT:
+        return now - self.started_at
+
+    def remaining_at(self, now: TimeT) -> DeltaT:
+        return self.duration - self.elapsed_at(now)
+
     @classmethod
     def never(cls: type[AbstractTimerT]) -> AbstractTimerT:
         return cls(cls.eternity() - cls.clock())
@@ -151,12 +167,14 @@ AbstractTimerT = TypeVar('AbstractTimerT', bound=AbstractTimer)
 
 
 class Timer(AbstractTimer[float, float]):
+    __slots__ = ()
     clock = time.monotonic
     eternity = staticmethod(lambda: float('inf'))
     format_duration = '{:.5g}'.format
 
 
 class DatetimeTimer(AbstractTimer[datetime, timedelta]):
+    __slots__ = ()
     clock = datetime.now
     eternity = staticmethod(lambda: datetime(3000, 1, 1, 0, 0, 0))
     format_duration = '{}'.format
@@ -167,6 +185,12 @@ def selftest() -> None:
     assert t.is_never
     assert not Timer(0.0).is_never
     assert Timer(0).is_expired
+    assert not hasattr(Timer(0), '__dict__')
+    t = Timer(2.0, started_at=10.0)
+    assert t.is_running_at(11.0) and not t.is_running_at(13.0)
+    assert t.is_expired_at(13.0) and not t.is_started_at(9.0)
+    assert t.remaining_at(11.5) == 0.5 and t.elapsed_at(11.5) == 1.5
+    assert Timer(t).duration == 2.0 and t.expires == 12.0
     assert DatetimeTimer(timedelta(minutes=2)).remaining
     assert '' != str(Timer(2))
     assert '' != DatetimeTimer(timedelta(minutes=2))